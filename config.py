@@ -1,4 +1,31 @@
 # config.py
 
-# Toggle between "mistral" and "phi3"
+# Toggle between "mistral", "phi3" and "cascade"
+# "cascade" runs Phi-3 first and only re-asks Mistral for fields that fail validation
 MODEL_MODE = "phi3"
+
+# Drop standard-form sentences seen in most processed contracts before chunking
+SUPPRESS_BOILERPLATE = True
+
+# Speculative decoding for the extractors: None, "prompt_lookup" or "phi3_draft"
+# "prompt_lookup" drafts tokens from the chunk in the prompt (both models)
+# "phi3_draft" uses Phi-3 as the draft model for Mistral
+SPECULATIVE_MODE = None
+
+# Where completions run: "local" (in-process llama_cpp) or "server"
+# "server" sends concurrent requests to local llama.cpp servers
+# (llama-server --parallel N --cont-batching), one per model
+LLM_BACKEND = "local"
+LLAMA_SERVER_URLS = {
+    "mistral": "http://127.0.0.1:8080",
+    "phi3": "http://127.0.0.1:8081",
+}
+
+# OCR for scanned PDFs: "threaded" (full color pages at 200 DPI) or "adaptive"
+# "adaptive" OCRs deskewed, cropped grayscale text regions at low DPI and
+# re-OCRs only low-confidence regions at high DPI
+OCR_MODE = "threaded"
+
+# How threaded OCR calls Tesseract: "per_page" (one process per page) or
+# "batched" (a few long-lived processes, each fed a list of page images)
+OCR_BACKEND = "per_page"
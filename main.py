@@ -1,16 +1,27 @@
+import hashlib
 import os
 import time
 
-from config import MODEL_MODE
+from config import MODEL_MODE, SUPPRESS_BOILERPLATE, LLM_BACKEND
 from modules.pdf_processor import extract_contract_text
 from modules.chunky import clean_and_chunk_contract_text_hybrid as chunk_text
 from modules.pattern_extractor import extract_fields_from_text as extract_by_pattern
+from modules.boilerplate_index import load_index, save_index, update_index, strip_boilerplate
+from modules.llm_backend import run_concurrently
+from modules.results_store import ResultsStore
+from modules.file_writer import OUTPUT_DIR, pxt_filename, write_pxt
 
 # Load Phi-3 only if needed
-if MODEL_MODE == "phi3":
+if MODEL_MODE == "cascade":
+    from modules.cascade_extractor import extract_fields_cascade
+elif MODEL_MODE == "phi3":
     from modules.nuextract_phi3 import extract_fields_from_chunk as extract_by_llm
+    from modules.nuextract_phi3 import extract_fields_from_chunk_async as extract_by_llm_async
+    from modules.nuextract_phi3 import default_backend as llm_backend
 else:
     from modules.llm_extractor import extract_fields_from_chunk as extract_by_llm
+    from modules.llm_extractor import extract_fields_from_chunk_async as extract_by_llm_async
+    from modules.llm_extractor import default_backend as llm_backend
 
 PDF_PATH = r"C:\Users\shawk\OneDrive\Desktop\KoobieKnaxx\data\input\Byrd Contract.pdf"
 
@@ -19,13 +30,24 @@ def format_time(seconds):
     secs = int(seconds) % 60
     return f"{mins}m {secs}s"
 
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 def main():
     if not os.path.exists(PDF_PATH):
         print(f"❌ File not found: {PDF_PATH}")
         return
 
     print(f"📥 Processing: {PDF_PATH}")
+    doc_hash = file_sha256(PDF_PATH)
+    timings = {}
+    stage_start = time.time()
     raw_text, was_scanned = extract_contract_text(PDF_PATH)
+    timings["text_extraction"] = time.time() - stage_start
 
     if not raw_text.strip():
         print("❌ No text extracted.")
@@ -35,11 +57,49 @@ def main():
     pattern_fields = extract_by_pattern(raw_text)
     print(f"✅ Pattern-based fields extracted: {len(pattern_fields)}")
 
-    # Step 2: Chunk text
-    chunks = chunk_text(raw_text)
+    # Step 2: Drop corpus-wide boilerplate, then chunk text
+    chunk_input = raw_text
+    if SUPPRESS_BOILERPLATE:
+        index = load_index()
+        chunk_input, saved = strip_boilerplate(raw_text, index, pattern_fields.values())
+        print(f"🧹 Boilerplate: {saved['sentences_dropped']} sentences dropped, "
+              f"~{saved['tokens_saved']} of {saved['tokens_before']} tokens saved")
+        # The boilerplate index has always keyed documents by text hash, not file hash
+        text_hash = hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+        if update_index(index, raw_text, text_hash):
+            save_index(index)
+
+    chunks = chunk_text(chunk_input)
     print(f"✂️ Text split into {len(chunks)} smart chunks")
 
     # Step 3: Fallback LLM only for missing fields
+    stage_start = time.time()
+    if MODEL_MODE == "cascade":
+        all_fields, stats = extract_fields_cascade(chunks, REQUIRED_FIELDS, pattern_fields)
+        print_cascade_stats(stats)
+        sources = stats["sources"]
+        timings.update({f"llm_{tier}": seconds for tier, seconds in stats["seconds"].items()})
+    else:
+        if LLM_BACKEND == "server":
+            all_fields = run_on_server(chunks, pattern_fields)
+        else:
+            all_fields = run_single_model(chunks, pattern_fields)
+        sources = {key: "pattern" if pattern_fields.get(key) == value else MODEL_MODE
+                   for key, value in all_fields.items()}
+    timings["llm"] = time.time() - stage_start
+
+    print("\n✅ Final Extracted Fields:")
+    print("-" * 40)
+    for key in sorted(all_fields):
+        print(f"{key} = {all_fields[key]}")
+
+    # Step 4: Store results and write the .pxt file
+    with ResultsStore() as store:
+        store.add_document(doc_hash, PDF_PATH, all_fields, sources, timings, used_ocr=was_scanned)
+    out_path = write_pxt(all_fields, os.path.join(OUTPUT_DIR, pxt_filename(PDF_PATH)))
+    print(f"\n💾 Saved results to {out_path}")
+
+def run_single_model(chunks, pattern_fields):
     all_fields = pattern_fields.copy()
     total_time = 0
 
@@ -64,10 +124,31 @@ def main():
         remaining = avg_time * (len(chunks) - (i + 1))
         print(f"   ⏳ Chunk processed in {chunk_end - chunk_start:.2f}s — Est. left: {format_time(remaining)}")
 
-    print("\n✅ Final Extracted Fields:")
-    print("-" * 40)
-    for key in sorted(all_fields):
-        print(f"{key} = {all_fields[key]}")
+    return all_fields
+
+def run_on_server(chunks, pattern_fields):
+    # All chunks go out at once; the server's continuous batching runs them together
+    all_fields = pattern_fields.copy()
+    start = time.time()
+    print(f"\n🧠 Sending {len(chunks)} chunks to the LLM server concurrently...")
+    results = run_concurrently(extract_by_llm_async, chunks, llm_backend)
+
+    for extracted in results:
+        for key in REQUIRED_FIELDS:
+            if extracted.get(key) and not all_fields.get(key):
+                all_fields[key] = extracted[key]
+
+    print(f"   ⏳ {len(chunks)} chunks processed in {time.time() - start:.2f}s")
+    return all_fields
+
+def print_cascade_stats(stats):
+    resolved = stats["resolved"]
+    seconds = stats["seconds"]
+    print("\n📊 Cascade summary:")
+    print(f"   Pattern: {resolved['pattern']} fields")
+    print(f"   Phi-3:   {resolved['phi3']} fields in {seconds['phi3']:.2f}s")
+    print(f"   Mistral: {resolved['mistral']} fields in {seconds['mistral']:.2f}s ({stats['mistral_calls']} chunk calls)")
+    print(f"   Unresolved: {resolved['unresolved']} fields")
 
 if __name__ == "__main__":
     # Minimal list of known field codes — expand as needed
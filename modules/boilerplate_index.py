@@ -0,0 +1,152 @@
+# File: modules/boilerplate_index.py
+# Purpose: Corpus-level boilerplate suppression for KoobieNaxx
+# Keeps document frequencies of normalized sentence hashes across processed
+# contracts, so standard-form text can be dropped before chunking and only
+# the filled-in content reaches the LLM.
+
+import hashlib
+import json
+import os
+import re
+
+INDEX_PATH = os.path.join("data", "boilerplate_index.json")
+
+# A sentence is boilerplate once it appears in this share of documents...
+BOILERPLATE_MIN_SHARE = 0.6
+# ...and only after the index has seen enough documents to judge
+MIN_DOCUMENTS = 5
+# Short lines (headings, labels) are cheap and give the LLM context; never drop them
+MIN_WORDS = 6
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.;:](?=\s)|$)", re.DOTALL)
+_PAGE_MARKER = re.compile(r"--- Page \d+ End \((?:Direct|OCR)\) ---")
+# Digits and emails mark filled-in content (prices, dates, addresses, phones,
+# license numbers); such sentences always reach the LLM, however common
+_FILLED_IN = re.compile(r"\d|@")
+# Labels next to required-field blanks. A recurring value (the builder that is
+# the seller on most contracts, the county, the usual escrow holder) would
+# otherwise make its sentence look like boilerplate, so these always stay.
+_FIELD_LABELS = re.compile(
+    r"\b(?:seller|buyer|purchaser)(?:\(s\)|s)?\b.{0,40}\b(?:called|whose address|is|are|name)\b"
+    r"|\bcounty\b|\bheld by\b|\bescrow (?:agent|holder)\b|\bsettlement agent\b"
+    r"|\b(?:listing|selling) (?:agent|firm|broker|company)\b"
+    r"|\bsubdivision\b|\bparcel\b|\bwhose address\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _normalize(sentence):
+    sentence = _PAGE_MARKER.sub(" ", sentence.lower())
+    sentence = re.sub(r"[^\w$%]+", " ", sentence)
+    return sentence.strip()
+
+
+def _hash(sentence):
+    return hashlib.sha1(_normalize(sentence).encode("utf-8")).hexdigest()[:16]
+
+
+def _sentences(paragraph):
+    return [m.group(0) for m in _SENTENCE_RE.finditer(paragraph)]
+
+
+def _count_tokens(text):
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except Exception:
+        return len(text.split())  # Rough fallback if tiktoken is unavailable
+
+
+def load_index(path=INDEX_PATH):
+    """Loads the persisted index, or returns an empty one."""
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read boilerplate index ({e}). Starting fresh.")
+    return {"documents": [], "counts": {}}
+
+
+def save_index(index, path=INDEX_PATH):
+    """Writes the index atomically (temp file + rename)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+def update_index(index, text, doc_id):
+    """
+    Adds one document's sentence hashes to the index. Documents already
+    seen (same doc_id) are skipped, so re-runs do not inflate counts.
+
+    Returns:
+        bool: True if the index changed.
+    """
+    if doc_id in index["documents"]:
+        return False
+
+    counts = index["counts"]
+    hashes = {_hash(s) for p in _PARAGRAPH_SPLIT.split(text) for s in _sentences(p) if _normalize(s)}
+    for h in hashes:
+        counts[h] = counts.get(h, 0) + 1
+    index["documents"].append(doc_id)
+    return True
+
+
+def _is_boilerplate(sentence, counts, min_count, keep_values):
+    if len(sentence.split()) < MIN_WORDS or _FILLED_IN.search(sentence):
+        return False
+    if _FIELD_LABELS.search(sentence):
+        return False
+    lowered = sentence.lower()
+    if any(value in lowered for value in keep_values):
+        return False
+    return counts.get(_hash(sentence), 0) >= min_count
+
+
+def strip_boilerplate(text, index, keep_values=()):
+    """
+    Drops sentences seen in most indexed contracts. Sentences with digits or
+    emails, required-field labels (seller/buyer names, county, deposit
+    holder, listing/selling firm, subdivision, parcel), or any of
+    keep_values (already-extracted field values) are always kept. Paragraphs left empty are removed entirely; everything else
+    keeps its original wording.
+
+    Returns:
+        (str: reduced_text, dict: stats) with "sentences_dropped",
+        "tokens_before", "tokens_after" and "tokens_saved".
+    """
+    num_docs = len(index["documents"])
+    if num_docs < MIN_DOCUMENTS:
+        tokens = _count_tokens(text)
+        return text, {"sentences_dropped": 0, "tokens_before": tokens,
+                      "tokens_after": tokens, "tokens_saved": 0}
+
+    counts = index["counts"]
+    min_count = BOILERPLATE_MIN_SHARE * num_docs
+    keep_values = [v.strip().lower() for v in keep_values if v and v.strip()]
+    kept_paragraphs = []
+    dropped = 0
+
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        sentences = _sentences(paragraph)
+        kept = [s for s in sentences if not _is_boilerplate(s, counts, min_count, keep_values)]
+        dropped += len(sentences) - len(kept)
+        if len(kept) == len(sentences):
+            kept_paragraphs.append(paragraph)  # Untouched, keep original line breaks
+        elif kept:
+            kept_paragraphs.append(" ".join(kept))
+
+    reduced = "\n\n".join(kept_paragraphs)
+    tokens_before = _count_tokens(text)
+    tokens_after = _count_tokens(reduced)
+    return reduced, {
+        "sentences_dropped": dropped,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+    }
@@ -0,0 +1,198 @@
+# File: modules/cascade_extractor.py
+# Purpose: Small-model-first extraction for KoobieNaxx
+# Phi-3 runs over the chunks first; only fields that fail format validation
+# (or are still missing) are re-asked of Mistral, using the one chunk they
+# most likely live in.
+
+import re
+import time
+
+from config import LLM_BACKEND
+from modules.field_validator import is_valid_field
+from modules.llm_backend import run_concurrently
+from modules.nuextract_phi3 import extract_fields_from_chunk as extract_by_phi3
+from modules.nuextract_phi3 import extract_fields_from_chunk_async as extract_by_phi3_async
+from modules.nuextract_phi3 import default_backend as phi3_backend
+
+# --- Chunk location hints for fields Phi-3 never returned ---
+FIELD_HINTS = {
+    "SETTDATE": ["closing", "settlement", "close on"],
+    "SALEPRIC": ["purchase price", "sale price"],
+    "DEPOSIT": ["deposit", "earnest"],
+    "DEPHELD": ["deposit", "held by", "escrow"],
+    "COUNTY": ["county"],
+    "SUBDIVN": ["subdivision"],
+    "PARCELID": ["parcel"],
+    "LORU": ["lot", "unit"],
+    "LOTUNIT": ["lot", "unit"],
+}
+PREFIX_HINTS = {
+    "BYR": ["buyer", "purchaser"],
+    "SLR": ["seller", "owner"],
+    "AG701": ["listing"],
+    "AG702": ["selling"],
+    "PROP": ["property"],
+    "STATE": ["property"],
+    "CITY": ["property"],
+}
+SUFFIX_HINTS = {
+    "EMAIL": ["@", "email"],
+    "EMAIL2": ["@", "email"],
+    "CELL1": ["phone", "cell", "mobile"],
+    "CELL2": ["phone", "cell", "mobile"],
+    "PH": ["phone"],
+    "MO": ["mobile", "cell"],
+    "LIC": ["license", "lic"],
+    "ADR1": ["address"],
+    "ADR2": ["address"],
+    "AD1": ["address"],
+    "AD2": ["address"],
+}
+
+
+def _hints_for(key):
+    hints = list(FIELD_HINTS.get(key, []))
+    for prefix, words in PREFIX_HINTS.items():
+        if key.startswith(prefix):
+            hints += words
+    for suffix, words in SUFFIX_HINTS.items():
+        if key.endswith(suffix):
+            hints += words
+    return hints
+
+
+def _hint_pattern(hint):
+    # Whole words only ("lot" must not match "allotted"); symbols like "@" match anywhere
+    prefix = r"(?<!\w)" if hint[0].isalnum() else ""
+    suffix = r"(?!\w)" if hint[-1].isalnum() else ""
+    return re.compile(prefix + re.escape(hint) + suffix)
+
+
+def _best_chunk_for(key, lowered_chunks):
+    """Index of the chunk with the most hint hits for this field, or None."""
+    patterns = [_hint_pattern(h) for h in _hints_for(key)]
+    if not patterns:
+        return None
+    scores = [sum(len(p.findall(chunk)) for p in patterns) for chunk in lowered_chunks]
+    best = max(range(len(scores)), key=scores.__getitem__, default=None)
+    if best is None or scores[best] == 0:
+        return None
+    return best
+
+
+def _phi3_sequential(chunks):
+    # Local model: one chunk at a time, so the caller can stop early
+    for i, chunk in enumerate(chunks):
+        print(f"\n🧠 Phi-3 extracting from chunk {i+1}/{len(chunks)}...")
+        yield extract_by_phi3(chunk)
+
+
+def _mistral_results(chunks):
+    # llm_extractor loads Mistral on import; defer that until a field escalates
+    from modules import llm_extractor
+    if LLM_BACKEND == "server":
+        return run_concurrently(llm_extractor.extract_fields_from_chunk_async,
+                                chunks, llm_extractor.default_backend)
+    return [llm_extractor.extract_fields_from_chunk(chunk) for chunk in chunks]
+
+
+def extract_fields_cascade(chunks, required_fields, known_fields=None):
+    """
+    Resolves required fields with Phi-3 first, escalating to Mistral only
+    for values that are missing or fail their format rule.
+
+    Args:
+        chunks (list[str]): Contract text chunks.
+        required_fields (list[str]): Field codes to resolve.
+        known_fields (dict): Already-extracted fields (e.g. pattern matches).
+
+    Returns:
+        (dict: fields, dict: stats) where stats holds "sources" (field -> tier,
+        or "<tier>_invalid" for a kept value that failed validation),
+        "resolved" (tier -> count; invalid values count as "unresolved"),
+        "seconds" (tier -> wall-clock) and "mistral_calls".
+    """
+    fields = dict(known_fields or {})
+    sources = {key: "pattern" for key in required_fields if is_valid_field(key, fields.get(key))}
+    seen_in = {}  # field -> chunk index where Phi-3 returned a malformed value
+    # field -> tier whose malformed value is being kept for now
+    invalid_from = {key: "pattern" for key in required_fields
+                    if fields.get(key) and key not in sources}
+    seconds = {"phi3": 0.0, "mistral": 0.0}
+
+    # --- Tier 1: Phi-3 over chunks until every required field is valid ---
+    # On a llama.cpp server every chunk is sent at once (no early stop) so
+    # continuous batching can run them together; locally it stays sequential.
+    tier_start = time.time()
+    if all(key in sources for key in required_fields):
+        phi3_results = []
+    elif LLM_BACKEND == "server":
+        print(f"\n🧠 Phi-3 extracting from {len(chunks)} chunks concurrently...")
+        phi3_results = run_concurrently(extract_by_phi3_async, chunks, phi3_backend)
+    else:
+        phi3_results = _phi3_sequential(chunks)
+
+    for i, extracted in enumerate(phi3_results):
+        needed = [key for key in required_fields if key not in sources]
+        for key in needed:
+            value = (extracted.get(key) or "").strip()
+            if not value:
+                continue
+            if is_valid_field(key, value):
+                fields[key] = value
+                sources[key] = "phi3"
+            elif key not in seen_in:
+                if key not in fields:
+                    fields[key] = value
+                    invalid_from[key] = "phi3"
+                seen_in[key] = i
+
+        if all(key in sources for key in required_fields):
+            break  # Checked before the next chunk is extracted
+    seconds["phi3"] = time.time() - tier_start
+
+    # --- Tier 2: Mistral, one call per chunk that holds escalated fields ---
+    lowered_chunks = [chunk.lower() for chunk in chunks]
+    by_chunk = {}
+    for key in required_fields:
+        if key in sources:
+            continue
+        idx = seen_in.get(key)
+        if idx is None:
+            idx = _best_chunk_for(key, lowered_chunks)
+        if idx is None and chunks:
+            idx = 0  # No hint matched anywhere; the first chunk holds the parties and terms
+        if idx is not None:
+            by_chunk.setdefault(idx, []).append(key)
+
+    if by_chunk:
+        tier_start = time.time()  # includes Mistral load time
+        indices = sorted(by_chunk)
+        for idx in indices:
+            print(f"\n🔁 Escalating {', '.join(by_chunk[idx])} to Mistral (chunk {idx+1})...")
+        mistral_results = _mistral_results([chunks[idx] for idx in indices])
+        for idx, extracted in zip(indices, mistral_results):
+            for key in by_chunk[idx]:
+                value = (extracted.get(key) or "").strip()
+                if is_valid_field(key, value):
+                    fields[key] = value
+                    sources[key] = "mistral"
+        seconds["mistral"] = time.time() - tier_start
+
+    # Malformed values that neither tier could fix are kept, but labelled as such
+    for key in required_fields:
+        if key not in sources and key in invalid_from:
+            sources[key] = f"{invalid_from[key]}_invalid"
+
+    resolved = {"pattern": 0, "phi3": 0, "mistral": 0, "unresolved": 0}
+    for key in required_fields:
+        source = sources.get(key, "unresolved")
+        resolved[source if source in resolved else "unresolved"] += 1
+
+    stats = {
+        "sources": sources,
+        "resolved": resolved,
+        "seconds": seconds,
+        "mistral_calls": len(by_chunk),
+    }
+    return fields, stats
@@ -0,0 +1,36 @@
+# File: modules/field_validator.py
+# Purpose: Format rules for extracted field values (mirrors the prompt "Rules:")
+
+import re
+
+DATE_RE = re.compile(r"(0[1-9]|1[0-2])/(0[1-9]|[12]\d|3[01])/\d{4}")  # MM/DD/YYYY
+PRICE_RE = re.compile(r"(\d{1,3}(,\d{3})+|\d+)\.\d{2}")  # 123456.00 or 123,456.00
+PHONE_RE = re.compile(r"1?\d{10}")  # NUMBERS ONLY
+STATE_RE = re.compile(r"[A-Z]{2}")
+ZIP_RE = re.compile(r"\d{5}")
+
+# Fields not listed here only need a non-empty value
+FIELD_FORMATS = {
+    "SETTDATE": DATE_RE,
+    "SALEPRIC": PRICE_RE,
+    "DEPOSIT": PRICE_RE,
+    "BYR1CELL1": PHONE_RE,
+    "BYR1CELL2": PHONE_RE,
+    "SLR1CELL1": PHONE_RE,
+    "SLR1CELL2": PHONE_RE,
+    "AG701PH": PHONE_RE,
+    "AG701MO": PHONE_RE,
+    "AG702PH": PHONE_RE,
+    "AG702MO": PHONE_RE,
+    "STATELET": STATE_RE,
+    "PROPZIP": ZIP_RE,
+}
+
+
+def is_valid_field(key: str, value) -> bool:
+    """True if the value is present and matches the field's format rule."""
+    value = (value or "").strip()
+    if not value:
+        return False
+    pattern = FIELD_FORMATS.get(key)
+    return bool(pattern.fullmatch(value)) if pattern else True
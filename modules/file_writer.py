@@ -0,0 +1,72 @@
+# File: modules/file_writer.py
+# Purpose: Formats extracted fields into .pxt files and names them
+# .pxt files are FIELDNAME=value lines, one field per line, named after the
+# source PDF. Writes are atomic (temp file + rename).
+
+import ntpath
+import os
+
+OUTPUT_DIR = os.path.join("data", "output")
+
+
+def format_pxt(fields):
+    """
+    Formats a {FIELD: value} dict as .pxt text (sorted FIELD=value lines).
+    Whitespace inside values, including newlines captured by multi-line
+    patterns, is collapsed so each field stays on one line.
+    """
+    lines = []
+    for key in sorted(fields):
+        value = " ".join(str(fields[key] or "").split())
+        if value:
+            lines.append(f"{key}={value}\n")
+    return "".join(lines)
+
+
+def pxt_filename(source_path):
+    """Output name for a contract: same stem as the PDF, .pxt extension."""
+    # ntpath splits on both "\\" and "/", so Windows paths stored in the
+    # results database still export correctly on other platforms
+    stem = os.path.splitext(ntpath.basename(source_path))[0]
+    return stem + ".pxt"
+
+
+def write_pxt(fields, out_path):
+    """Writes one .pxt file atomically, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\r\n") as f:
+        f.write(format_pxt(fields))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def export_all(store, out_dir=OUTPUT_DIR):
+    """
+    Re-exports every document in a ResultsStore as a .pxt file without
+    re-extraction. Documents are streamed from SQLite one at a time.
+
+    Returns:
+        int: number of files written.
+    """
+    count = 0
+    used_names = set()
+    for doc_hash, source_path, fields in store.iter_documents():
+        name = pxt_filename(source_path)
+        if name in used_names:  # Two PDFs with the same name: keep both
+            name = f"{os.path.splitext(name)[0]}_{doc_hash[:8]}.pxt"
+        used_names.add(name)
+        write_pxt(fields, os.path.join(out_dir, name))
+        count += 1
+    return count
+
+
+# --- Bulk export: python -m modules.file_writer [output_dir] ---
+if __name__ == "__main__":
+    import sys
+    from modules.results_store import ResultsStore
+
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_DIR
+    with ResultsStore() as store:
+        written = export_all(store, out_dir)
+    print(f"✅ Exported {written} .pxt files to {out_dir}")
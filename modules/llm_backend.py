@@ -0,0 +1,98 @@
+# File: modules/llm_backend.py
+# Purpose: Pluggable completion backends for the extractors
+# LocalLlamaBackend wraps an in-process llama_cpp.Llama (one call at a time).
+# LlamaServerBackend talks to a local OpenAI-compatible llama.cpp server
+# (llama-server --parallel N --cont-batching) over a pooled connection, so many
+# chunks can be in flight at once and the server batches them together.
+# Any server speaking POST /v1/completions works, including a test stub.
+
+import asyncio
+import json
+import threading
+import urllib.request
+
+REQUEST_TIMEOUT = 600  # seconds; CPU generation on long chunks is slow
+MAX_CONNECTIONS = 16   # Keep in line with the server's --parallel slots
+
+
+class LocalLlamaBackend:
+    """In-process llama_cpp.Llama. Calls are serialized; Llama isn't thread-safe."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, max_tokens, stop=None, temperature=0.8):
+        with self._lock:
+            response = self.llm(prompt, max_tokens=max_tokens, stop=stop,
+                                temperature=temperature, echo=False)
+        return response["choices"][0]["text"]
+
+    async def acomplete(self, prompt, max_tokens, stop=None, temperature=0.8):
+        return await asyncio.to_thread(self.complete, prompt, max_tokens, stop, temperature)
+
+    async def aclose(self):
+        pass
+
+
+class LlamaServerBackend:
+    """Client for a llama.cpp server's OpenAI-compatible completions endpoint."""
+
+    def __init__(self, base_url, max_connections=MAX_CONNECTIONS, timeout=REQUEST_TIMEOUT):
+        self.url = base_url.rstrip("/") + "/v1/completions"
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = None
+
+    def _payload(self, prompt, max_tokens, stop, temperature):
+        return {"prompt": prompt, "max_tokens": max_tokens,
+                "stop": stop or [], "temperature": temperature}
+
+    def complete(self, prompt, max_tokens, stop=None, temperature=0.8):
+        body = json.dumps(self._payload(prompt, max_tokens, stop, temperature)).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.load(response)
+        return data["choices"][0]["text"]
+
+    async def acomplete(self, prompt, max_tokens, stop=None, temperature=0.8):
+        import aiohttp  # Only needed for the async server path
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        payload = self._payload(prompt, max_tokens, stop, temperature)
+        async with self._session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return data["choices"][0]["text"]
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def run_concurrently(extract_async, chunks, backend):
+    """
+    Runs extract_async(chunk, backend) for every chunk at once (chunks may
+    come from many documents) and returns the results in chunk order.
+    A failed chunk yields {} rather than aborting the batch.
+    """
+    async def _run():
+        try:
+            results = await asyncio.gather(
+                *(extract_async(chunk, backend) for chunk in chunks),
+                return_exceptions=True,
+            )
+        finally:
+            await backend.aclose()
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                print(f"❌ LLM error on chunk {i+1}: {result}")
+        return [{} if isinstance(result, Exception) else result for result in results]
+
+    return asyncio.run(_run())
@@ -2,6 +2,10 @@ from llama_cpp import Llama
 import re
 import os # For potential future path joining
 
+from config import SPECULATIVE_MODE, LLM_BACKEND, LLAMA_SERVER_URLS
+from modules.llm_backend import LocalLlamaBackend, LlamaServerBackend
+from modules.speculative_decoding import make_draft_model, bind_draft_target
+
 # --- Configuration ---
 # Consider using environment variables or a config file in a real application
 MODEL_FILENAME = "Mistral-7B-Instruct-v0.3.Q4_K_M.gguf"
@@ -11,6 +15,10 @@ MODEL_PATH = os.path.join(MODELS_DIR, MODEL_FILENAME)
 N_CTX = 2048
 N_THREADS = 6 # Adjust to your CPU core count
 MAX_OUTPUT_TOKENS = 96 # Increased max tokens for output
+# llama_cpp's default; drafts are verified with the same sampler, so
+# speculative decoding doesn't change output at any temperature
+TEMPERATURE = 0.8
+STOP_SEQUENCES = ["\n\n", "---", "Fields:"] # Added "---" as a potential stop
 
 # Define expected fields explicitly for better parsing/validation
 EXPECTED_FIELDS = [
@@ -28,21 +36,32 @@ EXPECTED_FIELDS = [
 
 # --- Model Loading ---
 # Consider lazy loading if this module is part of a larger app
-try:
-    print(f"🌀 Loading model from: {MODEL_PATH}...")
-    llm = Llama(
-        model_path=MODEL_PATH,
-        n_ctx=N_CTX,
-        n_threads=N_THREADS,
-        verbose=False # Set to True for more detailed llama.cpp output
-    )
-    print("✅ Model loaded successfully.")
-except Exception as e:
-    print(f"❌❌❌ Fatal Error: Could not load model from {MODEL_PATH}")
-    print(f"Error details: {e}")
-    # Depending on your application structure, you might raise the exception
-    # or exit here if the model is essential.
-    llm = None # Ensure llm is None if loading failed
+llm = None
+if LLM_BACKEND == "server":
+    # Completions run on the llama.cpp server; nothing to load in-process
+    default_backend = LlamaServerBackend(LLAMA_SERVER_URLS["mistral"])
+else:
+    # Built outside the try: in "phi3_draft" mode this loads Phi-3, and its
+    # failure shouldn't be reported as a Mistral load error
+    draft_model = make_draft_model(SPECULATIVE_MODE)
+    try:
+        print(f"🌀 Loading model from: {MODEL_PATH}...")
+        llm = Llama(
+            model_path=MODEL_PATH,
+            n_ctx=N_CTX,
+            n_threads=N_THREADS,
+            draft_model=draft_model,
+            verbose=False # Set to True for more detailed llama.cpp output
+        )
+        bind_draft_target(llm)
+        print("✅ Model loaded successfully.")
+    except Exception as e:
+        print(f"❌❌❌ Fatal Error: Could not load model from {MODEL_PATH}")
+        print(f"Error details: {e}")
+        # Depending on your application structure, you might raise the exception
+        # or exit here if the model is essential.
+        llm = None # Ensure llm is None if loading failed
+    default_backend = LocalLlamaBackend(llm) if llm is not None else None
 # --- End Model Loading ---
 
 
@@ -124,22 +143,22 @@ AG702EMAIL=Selling agent email.
 # --- End Prompt Template ---
 
 
-def extract_fields_from_chunk(chunk_text):
+def extract_fields_from_chunk(chunk_text, backend=None):
     """Formats prompt, calls LLM, and parses output for a single chunk."""
-    if llm is None:
+    backend = backend or default_backend
+    if backend is None:
         print("❌ LLM not loaded. Cannot extract fields.")
         return {} # Return empty dict if model loading failed
 
     prompt = PROMPT_TEMPLATE.format(text=chunk_text.strip())
 
     try:
-        response = llm(
+        raw_output = backend.complete(
             prompt,
             max_tokens=MAX_OUTPUT_TOKENS,
-            stop=["\n\n", "---", "Fields:"], # Added "---" as a potential stop
-            echo=False # Don't repeat the prompt in the output
-        )
-        raw_output = response["choices"][0]["text"].strip()
+            stop=STOP_SEQUENCES,
+            temperature=TEMPERATURE
+        ).strip()
         # print(f"--- Raw LLM Output ---\n{raw_output}\n----------------------") # Uncomment for debugging
         return parse_output(raw_output)
     except Exception as e:
@@ -148,6 +167,23 @@ def extract_fields_from_chunk(chunk_text):
         return {} # Return empty dict on error
 
 
+async def extract_fields_from_chunk_async(chunk_text, backend=None):
+    """Async variant; lets many chunks share a server backend concurrently."""
+    backend = backend or default_backend
+    if backend is None:
+        print("❌ LLM not loaded. Cannot extract fields.")
+        return {}
+
+    prompt = PROMPT_TEMPLATE.format(text=chunk_text.strip())
+    raw_output = await backend.acomplete(
+        prompt,
+        max_tokens=MAX_OUTPUT_TOKENS,
+        stop=STOP_SEQUENCES,
+        temperature=TEMPERATURE
+    )
+    return parse_output(raw_output.strip())
+
+
 def parse_output(output_text):
     """Parses the 'FIELD=value' lines from the LLM output."""
     fields = {}
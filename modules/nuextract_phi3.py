@@ -4,18 +4,37 @@ from llama_cpp import Llama
 import os
 import re
 
+from config import SPECULATIVE_MODE, LLM_BACKEND, LLAMA_SERVER_URLS
+from modules.llm_backend import LocalLlamaBackend, LlamaServerBackend
+from modules.speculative_decoding import make_draft_model
+
 # Path to your downloaded Phi-3 model
 MODEL_PATH = os.path.join("models", "Phi-3-mini-4k-instruct-q4.gguf")
-
-# Load model (once)
-print("🧠 Loading Phi-3 model...")
-llm = Llama(
-    model_path=MODEL_PATH,
-    n_ctx=4096,
-    n_threads=os.cpu_count() or 4,
-    verbose=False
-)
-print("✅ Phi-3 model ready.")
+N_CTX = 4096
+N_THREADS = os.cpu_count() or 4
+MAX_OUTPUT_TOKENS = 512
+# "phi3_draft" speculates for Mistral only; Phi-3 itself runs plain
+SPEC_MODE = "prompt_lookup" if SPECULATIVE_MODE == "prompt_lookup" else None
+# llama_cpp's default; drafts are verified with the same sampler, so
+# speculative decoding doesn't change output at any temperature
+TEMPERATURE = 0.8
+STOP_SEQUENCES = ["Answer:"]
+
+# Load model (once), unless completions run on the llama.cpp server
+if LLM_BACKEND == "server":
+    llm = None
+    default_backend = LlamaServerBackend(LLAMA_SERVER_URLS["phi3"])
+else:
+    print("🧠 Loading Phi-3 model...")
+    llm = Llama(
+        model_path=MODEL_PATH,
+        n_ctx=N_CTX,
+        n_threads=N_THREADS,
+        draft_model=make_draft_model(SPEC_MODE),
+        verbose=False
+    )
+    default_backend = LocalLlamaBackend(llm)
+    print("✅ Phi-3 model ready.")
 
 # Few-shot prompt prefix
 PROMPT_TEMPLATE = """Extract specific fields from the contract text using FIELDNAME=value format.
@@ -92,17 +111,28 @@ AG702EMAIL=Selling agent email.
 
 """
 
-def extract_fields_from_chunk(chunk_text: str) -> dict:
+def extract_fields_from_chunk(chunk_text: str, backend=None) -> dict:
+    backend = backend or default_backend
     prompt = PROMPT_TEMPLATE.format(text=chunk_text.strip())
 
 
     try:
-        output = llm(prompt, max_tokens=512, stop=["Answer:"], echo=False)
-        result = output["choices"][0]["text"].strip()
+        result = backend.complete(prompt, max_tokens=MAX_OUTPUT_TOKENS, stop=STOP_SEQUENCES,
+                                  temperature=TEMPERATURE).strip()
     except Exception as e:
         print(f"❌ LLM error: {e}")
         return {}
 
+    return parse_output(result)
+
+async def extract_fields_from_chunk_async(chunk_text: str, backend=None) -> dict:
+    backend = backend or default_backend
+    prompt = PROMPT_TEMPLATE.format(text=chunk_text.strip())
+    result = await backend.acomplete(prompt, max_tokens=MAX_OUTPUT_TOKENS, stop=STOP_SEQUENCES,
+                                     temperature=TEMPERATURE)
+    return parse_output(result.strip())
+
+def parse_output(result: str) -> dict:
     # Extract FIELD=VALUE pairs from output
     fields = {}
     for line in result.splitlines():
@@ -0,0 +1,119 @@
+# File: modules/ocr_preprocess.py
+# Purpose: NumPy page preprocessing for adaptive-resolution OCR
+# Binarizes and deskews a grayscale page, then finds the text-bearing bands
+# so margins, blank areas and empty signature boxes are never sent to Tesseract.
+
+import numpy as np
+from PIL import Image
+
+DESKEW_MAX_ANGLE = 5.0   # degrees either way
+DESKEW_STEP = 0.5
+DESKEW_SAMPLE_WIDTH = 600  # angle search runs on a downsampled copy
+MIN_INK_PER_ROW = 2        # dark pixels needed for a row to count as text
+MIN_INK_PER_COL = 1
+BAND_GAP = 0.02            # rows (as a share of page height) merged into one band
+MIN_BAND_HEIGHT = 6        # px; thinner bands are rules or specks
+REGION_PAD = 8             # px added around each region
+
+
+def otsu_threshold(gray):
+    """Otsu's threshold for a uint8 grayscale array."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    weights = np.cumsum(hist)
+    means = np.cumsum(hist * np.arange(256))
+    global_mean = means[-1]
+
+    background = weights[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    between = np.zeros(255)
+    between[valid] = (global_mean * background[valid] - total * means[:-1][valid]) ** 2 / (
+        total * background[valid] * foreground[valid]
+    )
+    return int(np.argmax(between))
+
+
+def binarize(gray):
+    """True where a pixel is ink (darker than the Otsu threshold)."""
+    return gray <= otsu_threshold(gray)
+
+
+def estimate_skew(ink):
+    """
+    Skew angle (degrees) that makes text lines horizontal, found by
+    maximizing the variance of the row projection profile.
+    """
+    height, width = ink.shape
+    scale = min(1.0, DESKEW_SAMPLE_WIDTH / max(1, width))
+    sample = Image.fromarray((ink * 255).astype(np.uint8))
+    if scale < 1.0:
+        sample = sample.resize((max(1, int(width * scale)), max(1, int(height * scale))))
+
+    def score(angle):
+        rotated = np.asarray(sample.rotate(angle, fillcolor=0)) if angle else np.asarray(sample)
+        return float(np.var(rotated.sum(axis=1, dtype=np.int64)))
+
+    # Start from 0 and only move on a strict improvement, so blank or flat
+    # pages (all scores tied) are left unrotated
+    best_angle, best_score = 0.0, score(0.0)
+    for angle in np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + DESKEW_STEP, DESKEW_STEP):
+        angle = float(angle)
+        if angle == 0.0:
+            continue
+        angle_score = score(angle)
+        if angle_score > best_score:
+            best_angle, best_score = angle, angle_score
+    return best_angle
+
+
+def deskew(gray, angle):
+    """Rotates a grayscale page by angle, filling exposed corners with white."""
+    if not angle:
+        return gray
+    return np.asarray(Image.fromarray(gray).rotate(angle, fillcolor=255, resample=Image.BICUBIC))
+
+
+def find_text_regions(ink):
+    """
+    Returns (top, bottom, left, right) boxes for horizontal text bands,
+    top to bottom. Rows without ink are dropped; nearby rows are merged.
+    """
+    height, width = ink.shape
+    rows = np.flatnonzero(ink.sum(axis=1) >= MIN_INK_PER_ROW)
+    if rows.size == 0:
+        return []
+
+    max_gap = max(1, int(height * BAND_GAP))
+    breaks = np.flatnonzero(np.diff(rows) > max_gap)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]]))
+
+    regions = []
+    for top, bottom in zip(starts, ends):
+        if bottom - top + 1 < MIN_BAND_HEIGHT:
+            continue
+        cols = np.flatnonzero(ink[top:bottom + 1].sum(axis=0) >= MIN_INK_PER_COL)
+        if cols.size == 0:
+            continue
+        regions.append((
+            max(0, int(top) - REGION_PAD),
+            min(height, int(bottom) + 1 + REGION_PAD),
+            max(0, int(cols[0]) - REGION_PAD),
+            min(width, int(cols[-1]) + 1 + REGION_PAD),
+        ))
+    return regions
+
+
+def preprocess_page(image):
+    """
+    Grayscale + deskew + region detection for one rendered page.
+
+    Returns:
+        (np.ndarray: deskewed grayscale page, float: skew angle,
+         list[tuple]: text regions as (top, bottom, left, right))
+    """
+    gray = np.asarray(image.convert("L"))
+    angle = estimate_skew(binarize(gray))
+    gray = deskew(gray, angle)
+    return gray, angle, find_text_regions(binarize(gray))
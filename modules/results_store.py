@@ -0,0 +1,139 @@
+# File: modules/results_store.py
+# Purpose: Local SQLite store for extraction results
+# One row per document (keyed by file hash) and one per extracted field with
+# its source (pattern, phi3, mistral, ...). Fields are indexed by (field, value)
+# so lookups like PARCELID / BYR1NAM1 / SETTDATE across the corpus are fast.
+# Writes are buffered and committed in batches.
+
+import os
+import sqlite3
+import time
+
+DB_PATH = os.path.join("data", "output", "results.sqlite")
+BATCH_SIZE = 100  # documents per transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_hash     TEXT PRIMARY KEY,
+    source_path  TEXT NOT NULL,
+    used_ocr     INTEGER NOT NULL DEFAULT 0,
+    processed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    doc_hash TEXT NOT NULL REFERENCES documents(doc_hash) ON DELETE CASCADE,
+    field    TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    source   TEXT NOT NULL,
+    PRIMARY KEY (doc_hash, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS timings (
+    doc_hash TEXT NOT NULL REFERENCES documents(doc_hash) ON DELETE CASCADE,
+    stage    TEXT NOT NULL,
+    seconds  REAL NOT NULL,
+    PRIMARY KEY (doc_hash, stage)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_fields_field_value ON fields (field, value);
+"""
+
+
+class ResultsStore:
+    """
+    Batched writer/reader for extraction results. Use as a context manager
+    (or call close()) so the last partial batch is committed.
+    """
+
+    def __init__(self, path=DB_PATH, batch_size=BATCH_SIZE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_document(self, doc_hash, source_path, fields, sources=None, timings=None, used_ocr=False):
+        """
+        Queues one document's results. Re-adding a doc_hash replaces its
+        previous fields and timings.
+
+        Args:
+            fields (dict): FIELD -> value.
+            sources (dict): FIELD -> where the value came from (default "unknown").
+            timings (dict): stage -> seconds.
+        """
+        self._pending.append((doc_hash, source_path, fields, sources or {}, timings or {}, used_ocr))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all queued documents in a single transaction. If a doc_hash
+        was queued more than once, the last one wins. The queue is cleared
+        even if the write fails (the transaction is rolled back and the
+        error re-raised), so one bad batch can't wedge later writes.
+        """
+        if not self._pending:
+            return
+        latest = {}
+        for entry in self._pending:
+            latest.pop(entry[0], None)  # Re-insert so the last add keeps its place
+            latest[entry[0]] = entry
+        self._pending = []
+
+        docs, field_rows, timing_rows = [], [], []
+        for doc_hash, source_path, fields, sources, timings, used_ocr in latest.values():
+            docs.append((doc_hash, source_path, int(bool(used_ocr)), time.time()))
+            field_rows += [(doc_hash, key, str(value), sources.get(key, "unknown"))
+                           for key, value in fields.items() if value]
+            timing_rows += [(doc_hash, stage, float(seconds)) for stage, seconds in timings.items()]
+
+        with self.conn:
+            hashes = [(doc[0],) for doc in docs]
+            self.conn.executemany("DELETE FROM fields WHERE doc_hash = ?", hashes)
+            self.conn.executemany("DELETE FROM timings WHERE doc_hash = ?", hashes)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO documents (doc_hash, source_path, used_ocr, processed_at) "
+                "VALUES (?, ?, ?, ?)", docs)
+            self.conn.executemany(
+                "INSERT INTO fields (doc_hash, field, value, source) VALUES (?, ?, ?, ?)", field_rows)
+            self.conn.executemany(
+                "INSERT INTO timings (doc_hash, stage, seconds) VALUES (?, ?, ?)", timing_rows)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def find_documents(self, field, value):
+        """Returns [(doc_hash, source_path), ...] whose field equals value."""
+        self.flush()
+        return self.conn.execute(
+            "SELECT d.doc_hash, d.source_path FROM fields f "
+            "JOIN documents d ON d.doc_hash = f.doc_hash "
+            "WHERE f.field = ? AND f.value = ?", (field, value)).fetchall()
+
+    def iter_documents(self):
+        """
+        Streams (doc_hash, source_path, {field: value}) for every stored
+        document, in doc_hash order, without loading the corpus into memory.
+        """
+        self.flush()
+        cursor = self.conn.execute(
+            "SELECT d.doc_hash, d.source_path, f.field, f.value FROM documents d "
+            "LEFT JOIN fields f ON f.doc_hash = d.doc_hash ORDER BY d.doc_hash, f.field")
+        current, path, fields = None, None, {}
+        for doc_hash, source_path, field, value in cursor:
+            if doc_hash != current:
+                if current is not None:
+                    yield current, path, fields
+                current, path, fields = doc_hash, source_path, {}
+            if field is not None:
+                fields[field] = value
+        if current is not None:
+            yield current, path, fields
@@ -1,19 +1,34 @@
-from llama_cpp import Llama
+# File: modules/semantic_chunker.py
+# Purpose: Windowed semantic chunking
+# The model only classifies section boundaries: it sees numbered paragraph
+# previews in overlapping windows and answers with "[n] | Title" lines, never
+# re-emitting the text. Windows run concurrently on the LLM backend, and each
+# paragraph's decision is cached by hash, so cost grows linearly with length
+# and repeated standard-form paragraphs are never re-classified.
 
-# Load your model (tune n_ctx & n_threads as needed)
-llm = Llama(
-    model_path="models/Mistral-7B-Instruct-v0.3.Q4_K_M.gguf",
-    n_ctx=2048,
-    n_threads=6
-)
+import asyncio
+import hashlib
+import json
+import os
+import re
 
-# Prompt for semantic chunking
+from modules.llm_extractor import default_backend
+
+CACHE_PATH = os.path.join("data", "semantic_chunk_cache.json")
+
+PARAGRAPH_PREVIEW_CHARS = 300  # section starts are decided by a paragraph's opening
+WINDOW_MAX_CHARS = 4000        # ~1000 tokens of previews, well inside n_ctx=2048
+WINDOW_OVERLAP = 2             # context paragraphs shared with each neighbour
+TOKENS_PER_BOUNDARY = 16
+MAX_OUTPUT_TOKENS = 256
+DEFAULT_TITLE = "Other"
+
+# Prompt for boundary classification
 CHUNKING_PROMPT_TEMPLATE = """
-You are a contract processor. Split the legal contract text below into logical sections.
-Use this format:
+You are a contract processor. Below are numbered paragraphs from a legal contract.
+List the paragraphs that START a new logical section, one per line, in this format:
 
-SECTION: [Section Title]
-[Section Text]
+[paragraph number] | [Section Title]
 
 Example titles:
 - Buyer Information
@@ -27,33 +42,139 @@ Example titles:
 - Commission
 - Other
 
-Return only clearly divided sections. Keep text readable and unbroken.
+Only consider paragraphs {first} to {last}. Do not repeat paragraph text.
 
-Text:
-{text}
+Paragraphs:
+{paragraphs}
+
+Section starts:
 """
 
-def semantic_chunk_contract(cleaned_text):
-    prompt = CHUNKING_PROMPT_TEMPLATE.format(text=cleaned_text.strip())
+_BOUNDARY_LINE = re.compile(r"^\s*\[?(\d+)\]?\s*\|\s*(.+?)\s*$")
+
+
+def _paragraph_hash(paragraph):
+    normalized = " ".join(paragraph.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_cache(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read chunk cache ({e}). Starting fresh.")
+    return {}
+
+
+def _save_cache(cache, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def _build_windows(paragraphs):
+    """
+    Greedy windows of paragraph previews up to WINDOW_MAX_CHARS. Each window
+    owns [start, stop) and also shows WINDOW_OVERLAP paragraphs of context on
+    either side; only owned paragraphs take decisions from that window.
+    """
+    windows = []
+    start = 0
+    while start < len(paragraphs):
+        stop, size = start, 0
+        while stop < len(paragraphs):
+            preview = min(len(paragraphs[stop]), PARAGRAPH_PREVIEW_CHARS)
+            if stop > start and size + preview > WINDOW_MAX_CHARS:
+                break
+            size += preview
+            stop += 1
+        windows.append((start, stop))
+        start = stop
+    return windows
+
+
+def _window_prompt(paragraphs, start, stop):
+    lo = max(0, start - WINDOW_OVERLAP)
+    hi = min(len(paragraphs), stop + WINDOW_OVERLAP)
+    lines = [f"[{i}] {' '.join(paragraphs[i][:PARAGRAPH_PREVIEW_CHARS].split())}" for i in range(lo, hi)]
+    return CHUNKING_PROMPT_TEMPLATE.format(first=start, last=stop - 1, paragraphs="\n".join(lines))
+
+
+def parse_boundaries(llm_output, start, stop):
+    """Parses "[n] | Title" lines into {paragraph index: title} within [start, stop)."""
+    boundaries = {}
+    for line in llm_output.splitlines():
+        match = _BOUNDARY_LINE.match(line)
+        if match:
+            index = int(match.group(1))
+            if start <= index < stop:
+                boundaries[index] = match.group(2).strip("[] ") or DEFAULT_TITLE
+    return boundaries
+
+
+async def _classify_window(backend, paragraphs, start, stop):
+    prompt = _window_prompt(paragraphs, start, stop)
+    max_tokens = min(MAX_OUTPUT_TOKENS, TOKENS_PER_BOUNDARY * (stop - start) + 8)
+    output = await backend.acomplete(prompt, max_tokens=max_tokens, stop=["\n\n"], temperature=0.0)
+    return parse_boundaries(output, start, stop)
+
+
+async def _classify_windows(backend, paragraphs, windows):
+    try:
+        return await asyncio.gather(
+            *(_classify_window(backend, paragraphs, start, stop) for start, stop in windows),
+            return_exceptions=True,
+        )
+    finally:
+        await backend.aclose()
+
+
+def semantic_chunk_contract(cleaned_text, backend=None, cache_path=CACHE_PATH):
+    """
+    Splits cleaned contract text into logical sections.
+
+    Returns:
+        list[str]: sections formatted as "SECTION: Title\\n<section text>".
+    """
+    backend = backend or default_backend
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", cleaned_text.strip()) if p.strip()]
+    if not paragraphs:
+        return []
 
-    response = llm(prompt, max_tokens=1024, stop=["SECTION: Other"])
-    raw_output = response["choices"][0]["text"].strip()
+    cache = _load_cache(cache_path)
+    hashes = [_paragraph_hash(p) for p in paragraphs]
+    # Only windows with an uncached paragraph go to the model
+    windows = [(start, stop) for start, stop in _build_windows(paragraphs)
+               if any(h not in cache for h in hashes[start:stop])]
 
-    return parse_sections(raw_output)
+    if windows and backend is None:
+        print("❌ LLM not loaded. Cannot classify section boundaries.")
+    elif windows:
+        print(f"🧩 Classifying section boundaries in {len(windows)} windows...")
+        results = asyncio.run(_classify_windows(backend, paragraphs, windows))
+        for (start, stop), boundaries in zip(windows, results):
+            if isinstance(boundaries, Exception):
+                print(f"❌ Error classifying paragraphs {start}-{stop - 1}: {boundaries}")
+                continue
+            for i in range(start, stop):
+                cache[hashes[i]] = boundaries.get(i)  # title, or None if not a section start
+        _save_cache(cache, cache_path)
 
-def parse_sections(llm_output):
     sections = []
-    current_section = ""
-    lines = llm_output.splitlines()
-
-    for line in lines:
-        if line.strip().startswith("SECTION:"):
-            if current_section:
-                sections.append(current_section.strip())
-                current_section = ""
-        current_section += line + "\n"
-
-    if current_section:
-        sections.append(current_section.strip())
+    title, body = None, []
+    for paragraph, h in zip(paragraphs, hashes):
+        start_title = cache.get(h)
+        if start_title and body:
+            sections.append(f"SECTION: {title or DEFAULT_TITLE}\n" + "\n\n".join(body))
+            body = []
+        if start_title or not body:
+            title = start_title or title
+        body.append(paragraph)
+    if body:
+        sections.append(f"SECTION: {title or DEFAULT_TITLE}\n" + "\n\n".join(body))
 
     return sections
@@ -0,0 +1,148 @@
+# File: modules/speculative_decoding.py
+# Purpose: Speculative decoding drafts for the extractors
+# Nearly every extracted value is copied verbatim from the chunk in the
+# prompt, so drafting tokens from the prompt itself (prompt lookup) is
+# accepted most of the time. Phi-3 can also draft for Mistral.
+# Drafts are verified by the target model, so greedy output is unchanged.
+
+import sys
+import time
+
+import numpy as np
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+
+PROMPT_LOOKUP_MAX_NGRAM = 3
+NUM_PRED_TOKENS = 10
+
+
+class Phi3DraftModel(LlamaDraftModel):
+    """
+    Uses a smaller Llama (Phi-3) to draft tokens for a larger one (Mistral).
+    The vocabularies differ, so the context is round-tripped through text;
+    llama.cpp's prefix cache keeps the draft model's prompt eval incremental.
+
+    Pass it to the target's Llama(draft_model=...) so llama.cpp keeps logits
+    for every drafted position, then bind the target with bind_draft_target().
+    """
+
+    def __init__(self, draft, target=None, num_pred_tokens=NUM_PRED_TOKENS):
+        self.draft = draft
+        self.target = target
+        self.num_pred_tokens = num_pred_tokens
+
+    def __call__(self, input_ids, /, **kwargs):
+        if self.target is None:
+            return np.array([], dtype=np.intc)  # Not bound yet; verify-only step
+        context = self.target.detokenize(input_ids.tolist())
+        draft_ids = self.draft.tokenize(context, add_bos=True, special=True)
+
+        predicted = []
+        for token in self.draft.generate(draft_ids, temp=0.0):
+            if token == self.draft.token_eos() or len(predicted) >= self.num_pred_tokens:
+                break
+            predicted.append(token)
+
+        if not predicted:
+            return np.array([], dtype=np.intc)
+        continuation = self.draft.detokenize(predicted)
+        target_ids = self.target.tokenize(continuation, add_bos=False, special=True)
+        return np.array(target_ids[:self.num_pred_tokens], dtype=np.intc)
+
+
+def make_draft_model(mode):
+    """
+    Builds the draft model for a SPECULATIVE_MODE setting, or None.
+    It must be passed to Llama(draft_model=...): llama-cpp-python only keeps
+    logits for every position (needed to verify drafts) when it is given at
+    construction. A "phi3_draft" model still needs bind_draft_target().
+    """
+    if mode == "prompt_lookup":
+        return LlamaPromptLookupDecoding(
+            max_ngram_size=PROMPT_LOOKUP_MAX_NGRAM,
+            num_pred_tokens=NUM_PRED_TOKENS,
+        )
+    if mode == "phi3_draft":
+        from modules.nuextract_phi3 import llm as phi3_llm
+        return Phi3DraftModel(phi3_llm)
+    return None
+
+
+def bind_draft_target(target_llm):
+    """Points a Phi3DraftModel at the Llama it drafts for (no-op otherwise)."""
+    if isinstance(target_llm.draft_model, Phi3DraftModel):
+        target_llm.draft_model.target = target_llm
+
+
+def benchmark_speculative(plain_llm, speculative_llm, prompts, max_tokens, stop=None):
+    """
+    Runs each prompt greedily on two Llama instances built with the same
+    context settings, one plain and one with a draft model, and reports
+    completion tokens/sec for both.
+
+    Returns:
+        dict with "plain_tps", "speculative_tps", "speedup" and "identical"
+        (True if every output matched).
+    """
+    totals = {"plain": [0, 0.0], "speculative": [0, 0.0]}
+    identical = True
+
+    for i, prompt in enumerate(prompts):
+        outputs = {}
+        for label, llm in (("plain", plain_llm), ("speculative", speculative_llm)):
+            llm.reset()  # Don't reuse the previous prompt's cache
+            start = time.time()
+            response = llm(prompt, max_tokens=max_tokens, stop=stop, temperature=0.0, echo=False)
+            elapsed = time.time() - start
+            totals[label][0] += response["usage"]["completion_tokens"]
+            totals[label][1] += elapsed
+            outputs[label] = response["choices"][0]["text"]
+
+        same = outputs["plain"] == outputs["speculative"]
+        identical = identical and same
+        print(f"   Chunk {i+1}/{len(prompts)}: {'identical' if same else '❌ OUTPUT DIFFERS'}")
+
+    plain_tps = totals["plain"][0] / max(totals["plain"][1], 1e-9)
+    spec_tps = totals["speculative"][0] / max(totals["speculative"][1], 1e-9)
+    return {
+        "plain_tps": plain_tps,
+        "speculative_tps": spec_tps,
+        "speedup": spec_tps / max(plain_tps, 1e-9),
+        "identical": identical,
+    }
+
+
+# --- Benchmark: python -m modules.speculative_decoding <contract.pdf> [mistral|phi3] [prompt_lookup|phi3_draft] ---
+if __name__ == "__main__":
+    from llama_cpp import Llama
+    from modules.pdf_processor import extract_contract_text
+    from modules.chunky import clean_and_chunk_contract_text_hybrid
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m modules.speculative_decoding <contract.pdf> [mistral|phi3] [prompt_lookup|phi3_draft]")
+        sys.exit(1)
+
+    model = sys.argv[2] if len(sys.argv) > 2 else "mistral"
+    mode = sys.argv[3] if len(sys.argv) > 3 else "prompt_lookup"
+    if model == "phi3":
+        from modules import nuextract_phi3 as extractor
+        mode = "prompt_lookup"  # Phi-3 can't draft for itself
+    else:
+        from modules import llm_extractor as extractor
+
+    raw_text, _ = extract_contract_text(sys.argv[1])
+    chunks = clean_and_chunk_contract_text_hybrid(raw_text)
+    prompts = [extractor.PROMPT_TEMPLATE.format(text=chunk.strip()) for chunk in chunks]
+
+    # Two instances with identical context settings; only the draft differs
+    settings = dict(model_path=extractor.MODEL_PATH, n_ctx=extractor.N_CTX,
+                    n_threads=extractor.N_THREADS, verbose=False)
+    plain_llm = Llama(**settings)
+    speculative_llm = Llama(**settings, draft_model=make_draft_model(mode))
+    bind_draft_target(speculative_llm)
+
+    print(f"⚡ Benchmarking {mode} decoding on {len(prompts)} chunks ({model})...")
+    result = benchmark_speculative(plain_llm, speculative_llm, prompts,
+                                   extractor.MAX_OUTPUT_TOKENS, extractor.STOP_SEQUENCES)
+    print(f"   Plain:       {result['plain_tps']:.1f} tok/s")
+    print(f"   Speculative: {result['speculative_tps']:.1f} tok/s ({result['speedup']:.2f}x)")
+    print(f"   Outputs identical: {result['identical']}")
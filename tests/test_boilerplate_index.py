@@ -0,0 +1,67 @@
+# File: tests/test_boilerplate_index.py
+# Tests for corpus-level boilerplate suppression
+
+import pytest
+
+from modules import boilerplate_index
+
+SELLER = "SELLER(s) LEGACY NEW HOMES, LLC hereinafter called Seller agrees to sell the property."
+COUNTY = "The property is located in DeSoto County, Mississippi and described below."
+DEPHELD = "The earnest money deposit shall be held by First Southern Title Company."
+STANDARD = "The seller shall deliver good and marketable title at closing in all cases."
+
+
+def _contract(buyer):
+    return "\n\n".join([SELLER, COUNTY, DEPHELD, STANDARD, f"Buyer is {buyer} of this town."])
+
+
+@pytest.fixture
+def index():
+    idx = {"documents": [], "counts": {}}
+    for i in range(6):
+        boilerplate_index.update_index(idx, _contract(f"Buyer Number{i}"), f"doc{i}")
+    return idx
+
+
+def test_standard_text_is_dropped_but_recurring_field_sentences_survive(index):
+    reduced, stats = boilerplate_index.strip_boilerplate(_contract("Jane Doe"), index)
+
+    assert STANDARD not in reduced
+    assert SELLER in reduced
+    assert COUNTY in reduced
+    assert DEPHELD in reduced
+    assert "Jane Doe" in reduced
+    assert stats["sentences_dropped"] == 1
+
+
+def test_keep_values_protect_a_recurring_sentence(index):
+    reduced, _ = boilerplate_index.strip_boilerplate(_contract("Jane Doe"), index,
+                                                     ["marketable title"])
+    assert STANDARD in reduced
+
+
+def test_sentences_with_digits_or_emails_are_kept():
+    text = ("Contact the listing office at agent@example.com for any questions.\n\n"
+            "Closing shall occur on or before 06/05/2024 at the office.")
+    idx = {"documents": [], "counts": {}}
+    for i in range(6):
+        boilerplate_index.update_index(idx, text, f"doc{i}")
+    reduced, stats = boilerplate_index.strip_boilerplate(text, idx)
+    assert reduced == text
+    assert stats["sentences_dropped"] == 0
+
+
+def test_nothing_dropped_until_enough_documents_are_indexed():
+    idx = {"documents": [], "counts": {}}
+    boilerplate_index.update_index(idx, _contract("A"), "doc0")
+    reduced, stats = boilerplate_index.strip_boilerplate(_contract("B"), idx)
+    assert reduced == _contract("B")
+    assert stats["tokens_saved"] == 0
+
+
+def test_update_index_skips_seen_documents():
+    idx = {"documents": [], "counts": {}}
+    assert boilerplate_index.update_index(idx, STANDARD, "doc0")
+    assert not boilerplate_index.update_index(idx, STANDARD, "doc0")
+    assert idx["documents"] == ["doc0"]
+    assert set(idx["counts"].values()) == {1}
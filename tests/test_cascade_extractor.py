@@ -0,0 +1,121 @@
+# File: tests/test_cascade_extractor.py
+# Tests for field validation and the Phi-3 -> Mistral cascade bookkeeping
+# (both extractors are replaced by stubs, so no model is loaded)
+
+import importlib
+import sys
+import types
+
+import pytest
+
+from modules.field_validator import is_valid_field
+
+
+@pytest.mark.parametrize("key, value, valid", [
+    ("SETTDATE", "06/05/2024", True),
+    ("SETTDATE", "June 5, 2024", False),
+    ("SETTDATE", "13/05/2024", False),
+    ("SALEPRIC", "250000.00", True),
+    ("SALEPRIC", "250,000.00", True),
+    ("SALEPRIC", "250000", False),
+    ("BYR1CELL1", "6625551234", True),
+    ("BYR1CELL1", "(662) 555-1234", False),
+    ("STATELET", "MS", True),
+    ("STATELET", "Mississippi", False),
+    ("PROPZIP", "38632", True),
+    ("PROPZIP", "38632-1234", False),
+    ("BYR1NAM1", "Jane Doe", True),
+    ("BYR1NAM1", "   ", False),
+    ("BYR1NAM1", None, False),
+])
+def test_is_valid_field(key, value, valid):
+    assert is_valid_field(key, value) is valid
+
+
+@pytest.fixture
+def cascade(monkeypatch):
+    """Imports cascade_extractor against stub extractors driven by dicts."""
+    phi3_outputs, mistral_outputs = {}, {}
+    calls = {"phi3": [], "mistral": []}
+
+    def phi3(chunk):
+        calls["phi3"].append(chunk)
+        return dict(phi3_outputs.get(chunk, {}))
+
+    def mistral(chunk):
+        calls["mistral"].append(chunk)
+        return dict(mistral_outputs.get(chunk, {}))
+
+    phi3_module = types.ModuleType("modules.nuextract_phi3")
+    phi3_module.extract_fields_from_chunk = phi3
+    phi3_module.extract_fields_from_chunk_async = None
+    phi3_module.default_backend = None
+    mistral_module = types.ModuleType("modules.llm_extractor")
+    mistral_module.extract_fields_from_chunk = mistral
+
+    config_module = types.ModuleType("config")
+    config_module.LLM_BACKEND = "local"
+    monkeypatch.setitem(sys.modules, "config", config_module)
+    monkeypatch.setitem(sys.modules, "modules.nuextract_phi3", phi3_module)
+    monkeypatch.setitem(sys.modules, "modules.llm_extractor", mistral_module)
+    monkeypatch.delitem(sys.modules, "modules.cascade_extractor", raising=False)
+    module = importlib.import_module("modules.cascade_extractor")
+    yield module, phi3_outputs, mistral_outputs, calls
+    sys.modules.pop("modules.cascade_extractor", None)
+
+
+def test_invalid_value_replaced_by_valid_one_from_a_later_chunk(cascade):
+    module, phi3_outputs, _, calls = cascade
+    chunks = ["closing on June 5", "closing date 06/05/2024"]
+    phi3_outputs[chunks[0]] = {"SETTDATE": "June 5"}
+    phi3_outputs[chunks[1]] = {"SETTDATE": "06/05/2024"}
+
+    fields, stats = module.extract_fields_cascade(chunks, ["SETTDATE"])
+
+    assert fields == {"SETTDATE": "06/05/2024"}
+    assert stats["sources"] == {"SETTDATE": "phi3"}
+    assert stats["resolved"]["phi3"] == 1
+    assert calls["mistral"] == []
+
+
+def test_invalid_phi3_value_escalated_to_its_chunk(cascade):
+    module, phi3_outputs, mistral_outputs, calls = cascade
+    chunks = ["buyer info", "closing on June 5"]
+    phi3_outputs[chunks[1]] = {"SETTDATE": "June 5"}
+    mistral_outputs[chunks[1]] = {"SETTDATE": "06/05/2024"}
+
+    fields, stats = module.extract_fields_cascade(chunks, ["SETTDATE"])
+
+    assert calls["mistral"] == [chunks[1]]
+    assert fields["SETTDATE"] == "06/05/2024"
+    assert stats["sources"]["SETTDATE"] == "mistral"
+
+
+def test_unfixable_pattern_value_is_labelled_invalid(cascade):
+    module, _, _, _ = cascade
+    fields, stats = module.extract_fields_cascade(["purchase price text"], ["SALEPRIC"],
+                                                  {"SALEPRIC": "250000"})
+
+    assert fields["SALEPRIC"] == "250000"
+    assert stats["sources"]["SALEPRIC"] == "pattern_invalid"
+    assert stats["resolved"] == {"pattern": 0, "phi3": 0, "mistral": 0, "unresolved": 1}
+
+
+def test_missing_field_without_hint_match_falls_back_to_first_chunk(cascade):
+    module, _, mistral_outputs, calls = cascade
+    chunks = ["called Jane Doe whose address", "other terms"]
+    mistral_outputs[chunks[0]] = {"BYR1NAM1": "Jane Doe"}
+
+    fields, stats = module.extract_fields_cascade(chunks, ["BYR1NAM1"])
+
+    assert calls["mistral"] == [chunks[0]]
+    assert stats["sources"]["BYR1NAM1"] == "mistral"
+    assert stats["mistral_calls"] == 1
+
+
+def test_hints_match_whole_words_only(cascade):
+    module, _, _, _ = cascade
+    lowered = ["allotted to the pilot of the community", "lot 74, unit b"]
+    assert module._best_chunk_for("LOTUNIT", lowered) == 1
+    assert module._best_chunk_for("AG701LIC", ["public record", "lic. # 1234"]) == 1
+    assert module._best_chunk_for("BYR1EMAIL", ["no address", "jane@example.com"]) == 1
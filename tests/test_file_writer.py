@@ -0,0 +1,66 @@
+# File: tests/test_file_writer.py
+# Tests .pxt formatting and output, and the SQLite results store round-trip
+
+import os
+
+from modules.file_writer import format_pxt, export_all, write_pxt
+from modules.results_store import ResultsStore
+
+
+def test_format_pxt_sorts_fields_and_skips_empty_values():
+    fields = {"SALEPRIC": "250000.00", "BYR1NAM1": "Jane Doe", "BYR1NAM2": ""}
+    assert format_pxt(fields) == "BYR1NAM1=Jane Doe\nSALEPRIC=250000.00\n"
+
+
+def test_format_pxt_collapses_embedded_newlines():
+    fields = {"BYR1NAM1": "John Smith\nand Jane  Smith\n", "SETTDATE": "06/05/2024"}
+    assert format_pxt(fields) == "BYR1NAM1=John Smith and Jane Smith\nSETTDATE=06/05/2024\n"
+
+
+def test_write_pxt_is_atomic(tmp_path):
+    out_path = tmp_path / "out" / "Byrd Contract.pxt"
+    write_pxt({"PROPZIP": "38632"}, str(out_path))
+    assert out_path.read_text(encoding="utf-8") == "PROPZIP=38632\n"
+    assert not os.path.exists(str(out_path) + ".tmp")
+
+
+def test_store_round_trip_and_export(tmp_path):
+    db_path = str(tmp_path / "results.sqlite")
+    with ResultsStore(db_path, batch_size=10) as store:
+        store.add_document("h1", r"C:\in\Byrd Contract.pdf", {"PARCELID": "1234"},
+                           {"PARCELID": "pattern"}, {"llm": 1.5})
+        store.add_document("h2", "/in/Other.pdf", {"PARCELID": "1234", "BYR1NAM1": "Bob"})
+        store.add_document("h3", "/x/Other.pdf", {"PARCELID": "9"})
+
+        assert sorted(store.find_documents("PARCELID", "1234")) == [
+            ("h1", r"C:\in\Byrd Contract.pdf"), ("h2", "/in/Other.pdf")]
+        assert store.conn.execute(
+            "SELECT source FROM fields WHERE doc_hash = 'h1'").fetchone() == ("pattern",)
+
+        written = export_all(store, str(tmp_path / "pxt"))
+
+    assert written == 3
+    assert sorted(os.listdir(tmp_path / "pxt")) == ["Byrd Contract.pxt", "Other.pxt", "Other_h3.pxt"]
+    assert (tmp_path / "pxt" / "Other.pxt").read_text(encoding="utf-8") == "BYR1NAM1=Bob\nPARCELID=1234\n"
+
+
+def test_store_same_doc_twice_in_one_batch_keeps_last(tmp_path):
+    db_path = str(tmp_path / "results.sqlite")
+    with ResultsStore(db_path, batch_size=10) as store:
+        store.add_document("h1", "/in/A.pdf", {"PARCELID": "old", "SETTDATE": "01/01/2024"})
+        store.add_document("h1", "/in/A.pdf", {"PARCELID": "new"})
+        store.add_document("h2", "/in/B.pdf", {"PARCELID": "other"})
+        store.flush()
+        docs = list(store.iter_documents())
+
+    assert docs == [("h1", "/in/A.pdf", {"PARCELID": "new"}),
+                    ("h2", "/in/B.pdf", {"PARCELID": "other"})]
+
+
+def test_store_replaces_previously_flushed_doc(tmp_path):
+    db_path = str(tmp_path / "results.sqlite")
+    with ResultsStore(db_path, batch_size=1) as store:
+        store.add_document("h1", "/in/A.pdf", {"PARCELID": "old"})
+        store.add_document("h1", "/in/A.pdf", {"PARCELID": "new"})
+        assert store.find_documents("PARCELID", "old") == []
+        assert store.find_documents("PARCELID", "new") == [("h1", "/in/A.pdf")]
@@ -0,0 +1,100 @@
+# File: tests/test_llm_backend.py
+# Tests for the llama.cpp server backend against a small aiohttp stub server
+
+import asyncio
+import threading
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from modules.llm_backend import LlamaServerBackend, run_concurrently
+
+
+class StubServer:
+    """OpenAI-style /v1/completions stub that echoes the prompt back."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    async def _completions(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        if body["prompt"] == "FAIL":
+            return web.Response(status=500)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return web.json_response({"choices": [{"text": f"SETTDATE={body['prompt']}"}]})
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_post("/v1/completions", self._completions)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+    def __enter__(self):
+        self.thread.start()
+        self.ready.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+
+async def _echo_extract(chunk, backend):
+    text = await backend.acomplete(chunk, max_tokens=8, stop=["\n\n"], temperature=0.0)
+    return {"text": text}
+
+
+def test_acomplete_sends_openai_payload():
+    with StubServer(delay=0) as server:
+        backend = LlamaServerBackend(server.url)
+
+        async def _run():
+            try:
+                return await backend.acomplete("hello", max_tokens=5, stop=["x"], temperature=0.0)
+            finally:
+                await backend.aclose()
+
+        assert asyncio.run(_run()) == "SETTDATE=hello"
+    assert server.requests == [{"prompt": "hello", "max_tokens": 5, "stop": ["x"], "temperature": 0.0}]
+
+
+def test_sync_complete_matches_async():
+    with StubServer(delay=0) as server:
+        assert LlamaServerBackend(server.url).complete("abc", max_tokens=5) == "SETTDATE=abc"
+
+
+def test_run_concurrently_keeps_order_and_overlaps_requests():
+    chunks = [f"chunk{i}" for i in range(8)]
+    with StubServer(delay=0.2) as server:
+        results = run_concurrently(_echo_extract, chunks, LlamaServerBackend(server.url))
+    assert results == [{"text": f"SETTDATE={chunk}"} for chunk in chunks]
+    assert server.max_in_flight > 1
+
+
+def test_run_concurrently_returns_empty_dict_for_failed_chunk():
+    with StubServer(delay=0) as server:
+        results = run_concurrently(_echo_extract, ["a", "FAIL", "b"], LlamaServerBackend(server.url))
+    assert results == [{"text": "SETTDATE=a"}, {}, {"text": "SETTDATE=b"}]
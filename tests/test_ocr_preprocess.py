@@ -0,0 +1,66 @@
+# File: tests/test_ocr_preprocess.py
+# Tests for the NumPy page preprocessing used by adaptive OCR
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from modules.ocr_preprocess import (
+    binarize, estimate_skew, find_text_regions, otsu_threshold, preprocess_page,
+)
+
+
+def _text_page(width=1200, height=1600, blocks=((200, 600), (1000, 1100))):
+    """White page with bands of dark 'text lines' (bars with word gaps)."""
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    for top, bottom in blocks:
+        for y in range(top, bottom, 30):
+            for x in range(150, width - 250, 60):
+                draw.rectangle((x, y, x + 45, y + 10), fill=0)
+    return page
+
+
+def test_otsu_threshold_splits_a_bimodal_image():
+    gray = np.array([[20] * 50 + [230] * 50] * 10, dtype=np.uint8)
+    assert 20 <= otsu_threshold(gray) < 230
+    assert binarize(gray)[:, :50].all() and not binarize(gray)[:, 50:].any()
+
+
+def test_blank_page_is_not_rotated():
+    blank = np.full((1000, 800), 255, dtype=np.uint8)
+    assert estimate_skew(binarize(blank)) == 0.0
+
+
+def test_straight_page_is_not_rotated():
+    gray = np.asarray(_text_page())
+    assert estimate_skew(binarize(gray)) == 0.0
+
+
+@pytest.mark.parametrize("angle", [2.0, -3.0])
+def test_skewed_page_is_detected(angle):
+    gray = np.asarray(_text_page().rotate(angle, fillcolor=255))
+    assert estimate_skew(binarize(gray)) == pytest.approx(-angle, abs=0.5)
+
+
+def test_find_text_regions_returns_padded_bands_top_to_bottom():
+    ink = binarize(np.asarray(_text_page()))
+    regions = find_text_regions(ink)
+    assert len(regions) == 2
+    (top1, bottom1, left1, right1), (top2, bottom2, _, _) = regions
+    assert top1 <= 200 < 600 <= bottom1 < top2 <= 1000 < 1100 <= bottom2
+    assert left1 <= 150 and right1 < 1200
+
+
+def test_find_text_regions_ignores_blank_pages_and_specks():
+    ink = np.zeros((1000, 800), dtype=bool)
+    assert find_text_regions(ink) == []
+    ink[500:502, 400:420] = True  # a 2 px rule / speck
+    assert find_text_regions(ink) == []
+
+
+def test_preprocess_page_deskews_and_crops():
+    gray, angle, regions = preprocess_page(_text_page().rotate(2.0, fillcolor=255))
+    assert angle == pytest.approx(-2.0, abs=0.5)
+    assert gray.shape == (1600, 1200)
+    assert len(regions) == 2
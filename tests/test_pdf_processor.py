@@ -0,0 +1,170 @@
+# File: tests/test_pdf_processor.py
+# Tests for PDF extraction + OCR fallback helpers
+
+import pytest
+
+pytest.importorskip("fitz")
+pytest.importorskip("pytesseract")
+pytest.importorskip("pdf2image")
+
+import fitz
+
+from modules import pdf_processor
+from modules.pdf_processor import _assemble_pages, _ocr_page_texts, page_for_offset
+
+
+def _page_starts(text, offsets):
+    return [text[offset:offset + 6] for offset in offsets]
+
+
+def test_assemble_pages_offsets_point_at_each_page():
+    text, offsets = _assemble_pages(["page one", "page two", "page three"], "Direct")
+    assert _page_starts(text, offsets) == ["page o", "page t", "page t"]
+    assert text.endswith("--- Page 3 End (Direct) ---")
+
+
+def test_assemble_pages_strips_leading_whitespace_and_shifts_offsets():
+    text, offsets = _assemble_pages(["\n\n   first", "second"], "Direct")
+    assert text.startswith("first")
+    assert offsets[0] == 0
+    assert text[offsets[1]:].startswith("second")
+
+
+def test_assemble_pages_handles_empty_pages():
+    text, offsets = _assemble_pages(["", "", "third"], "OCR")
+    assert text.startswith("--- Page 1 End (OCR) ---")
+    assert len(offsets) == 3
+    assert offsets[0] == 0 < offsets[1] < offsets[2]
+    assert text[offsets[2]:].startswith("third")
+
+
+def test_ocr_error_pages_keep_their_slot():
+    text, offsets = _assemble_pages(_ocr_page_texts(["alpha", None, "gamma"]), "OCR")
+    assert "--- ERROR OCRing Page 2 ---" in text[offsets[1]:offsets[2]]
+    assert text[offsets[2]:].startswith("gamma")
+    assert page_for_offset(offsets, text.index("ERROR OCRing")) == 2
+
+
+def test_page_for_offset_maps_every_character():
+    text, offsets = _assemble_pages(["aaa", "bbb", "ccc"], "Direct")
+    for page, marker in enumerate(["aaa", "bbb", "ccc"], start=1):
+        assert page_for_offset(offsets, text.index(marker)) == page
+    assert page_for_offset(offsets, 0) == 1
+    assert page_for_offset(offsets, len(text) - 1) == 3
+
+
+def test_attempt_direct_returns_text_and_page_offsets(tmp_path):
+    pdf_path = str(tmp_path / "contract.pdf")
+    doc = fitz.open()
+    for n in range(1, 4):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {n} " + "purchase price and deposit terms " * 3)
+    doc.save(pdf_path)
+    doc.close()
+
+    text, offsets = pdf_processor._attempt_direct(pdf_path)
+    assert len(offsets) == 3
+    for n, offset in enumerate(offsets, start=1):
+        assert text[offset:].startswith(f"Page {n} ")
+
+
+# --- Adaptive OCR escalation ---
+
+from tests.test_ocr_preprocess import _text_page
+
+
+@pytest.fixture
+def adaptive(monkeypatch):
+    """Stubs region OCR and the high-DPI render; returns the call log."""
+    log = {"renders": 0, "ocr": []}
+    replies = []
+
+    def fake_ocr_region(image):
+        log["ocr"].append(image.size)
+        return replies.pop(0)
+
+    def fake_convert(pdf_path, dpi, **kwargs):
+        log["renders"] += 1
+        return [_text_page(width=2400, height=3200,
+                           blocks=((400, 1200), (2000, 2200)))]
+
+    monkeypatch.setattr(pdf_processor, "_ocr_region", fake_ocr_region)
+    monkeypatch.setattr(pdf_processor, "convert_from_path", fake_convert)
+    return log, replies
+
+
+def test_regions_without_words_do_not_trigger_a_rerender(adaptive):
+    log, replies = adaptive
+    replies += [("Purchase price terms", 91.0), ("", None)]
+    text = pdf_processor._adaptive_page_worker("x.pdf", 1, _text_page())
+    assert text == "Purchase price terms"
+    assert log["renders"] == 0
+
+
+def test_low_confidence_region_is_reread_at_high_dpi_once(adaptive):
+    log, replies = adaptive
+    # Each weak region is re-read right after its low-DPI pass
+    replies += [("Purch4se pr1ce", 40.0), ("Purchase price", 88.0),
+                ("Buyer: J0hn", 50.0), ("Buyer: John", 90.0)]
+    text = pdf_processor._adaptive_page_worker("x.pdf", 1, _text_page())
+    assert text == "Purchase price\n\nBuyer: John"
+    assert log["renders"] == 1
+    low_res, high_res = log["ocr"][0], log["ocr"][1]
+    assert high_res[0] == pytest.approx(2 * low_res[0], abs=2)
+
+
+# --- Batched OCR: parsing tesseract's multi-page TSV ---
+
+from types import SimpleNamespace
+
+from PIL import Image
+
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def _tsv_row(page, block, par, line, word, conf, text):
+    return f"5\t{page}\t{block}\t{par}\t{line}\t{word}\t0\t0\t10\t10\t{conf}\t{text}"
+
+
+CANNED_TSV = "\n".join([
+    TSV_HEADER,
+    "1\t1\t0\t0\t0\t0\t0\t0\t850\t1100\t-1\t",
+    _tsv_row(1, 1, 1, 1, 1, 96, "Purchase"),
+    _tsv_row(1, 1, 1, 1, 2, 94, "Agreement"),
+    _tsv_row(1, 1, 2, 1, 1, 90, "Seller:"),
+    _tsv_row(1, 1, 2, 1, 2, 88, "Jane"),
+    _tsv_row(1, 1, 2, 2, 1, 86, "Buyer:"),
+    _tsv_row(1, 1, 2, 2, 2, 84, "John"),
+    "1\t2\t0\t0\t0\t0\t0\t0\t850\t1100\t-1\t",
+    _tsv_row(2, 1, 1, 1, 1, -1, "~~"),
+    _tsv_row(2, 1, 1, 1, 2, 80, "Closing"),
+    _tsv_row(2, 2, 1, 1, 1, 70, "County:"),
+    _tsv_row(2, 2, 1, 1, 2, 60, "Travis"),
+    "1\t3\t0\t0\t0\t0\t0\t0\t850\t1100\t-1\t",
+]) + "\n"
+
+
+def test_batch_worker_splits_tsv_into_pages_and_paragraphs(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return SimpleNamespace(stdout=CANNED_TSV)
+
+    monkeypatch.setattr(pdf_processor.subprocess, "run", fake_run)
+    images = [Image.new("L", (20, 20), 255) for _ in range(3)]
+    results = pdf_processor._ocr_batch_worker(images)
+
+    assert len(calls) == 1
+    assert results[0] == ("Purchase Agreement\n\nSeller: Jane\nBuyer: John", pytest.approx(89.666, abs=0.01))
+    # conf == -1 words are dropped from both the text and the mean
+    assert results[1] == ("Closing\n\nCounty: Travis", pytest.approx(70.0))
+    assert results[2] == ("", None)
+
+
+def test_batch_worker_reports_missing_tesseract(monkeypatch):
+    def fake_run(cmd, **kwargs):
+        raise FileNotFoundError(cmd[0])
+
+    monkeypatch.setattr(pdf_processor.subprocess, "run", fake_run)
+    assert pdf_processor._ocr_batch_worker([Image.new("L", (20, 20), 255)]) == "TESSERACT_NOT_FOUND"
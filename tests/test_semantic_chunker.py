@@ -0,0 +1,136 @@
+# File: tests/test_semantic_chunker.py
+# Tests for windowed semantic chunking against a fake async LLM backend
+
+import importlib
+import json
+import re
+import sys
+import types
+
+import pytest
+
+
+class FakeBackend:
+    """acomplete() answers "[n] | Title" for every shown paragraph in titles."""
+
+    def __init__(self, titles=None, fail_windows=()):
+        self.titles = titles or {}
+        self.fail_windows = set(fail_windows)
+        self.windows = []
+        self.closed = 0
+
+    async def acomplete(self, prompt, max_tokens, stop=None, temperature=0.0):
+        first, last = map(int, re.search(r"paragraphs (\d+) to (\d+)", prompt).groups())
+        self.windows.append((first, last + 1))
+        if first in self.fail_windows:
+            raise RuntimeError("server busy")
+        shown = [int(n) for n in re.findall(r"^\[(\d+)\]", prompt, re.M)]
+        # Also answer for context paragraphs; the window must ignore those
+        return "\n".join(f"[{i}] | {self.titles[i]}" for i in shown if i in self.titles)
+
+    async def aclose(self):
+        self.closed += 1
+
+
+@pytest.fixture
+def chunker(monkeypatch):
+    """Imports semantic_chunker without loading the real llama.cpp model."""
+    llm_module = types.ModuleType("modules.llm_extractor")
+    llm_module.default_backend = None
+    monkeypatch.setitem(sys.modules, "modules.llm_extractor", llm_module)
+    monkeypatch.delitem(sys.modules, "modules.semantic_chunker", raising=False)
+    module = importlib.import_module("modules.semantic_chunker")
+    yield module
+    sys.modules.pop("modules.semantic_chunker", None)
+
+
+def _paragraphs(count, size=300):
+    return [f"Paragraph {i} " + "x" * (size - len(f"Paragraph {i} ")) for i in range(count)]
+
+
+def test_windows_own_every_paragraph_exactly_once(chunker):
+    paragraphs = _paragraphs(30)
+    windows = chunker._build_windows(paragraphs)
+
+    per_window = chunker.WINDOW_MAX_CHARS // chunker.PARAGRAPH_PREVIEW_CHARS
+    assert windows == [(0, per_window), (per_window, 2 * per_window), (2 * per_window, 30)]
+    owned = [i for start, stop in windows for i in range(start, stop)]
+    assert owned == list(range(30))
+
+
+def test_oversized_paragraph_still_gets_a_window(chunker):
+    paragraphs = ["x" * 10000, "short"]
+    assert chunker._build_windows(paragraphs) == [(0, 2)]
+
+
+def test_window_prompt_shows_overlap_but_limits_decisions(chunker):
+    paragraphs = _paragraphs(30)
+    prompt = chunker._window_prompt(paragraphs, 13, 26)
+    shown = [int(n) for n in re.findall(r"^\[(\d+)\]", prompt, re.M)]
+    overlap = chunker.WINDOW_OVERLAP
+    assert shown == list(range(13 - overlap, 26 + overlap))
+    assert "Only consider paragraphs 13 to 25." in prompt
+
+
+def test_parse_boundaries_keeps_owned_indices_only(chunker):
+    output = "\n".join([
+        "[12] | Deposit",        # context paragraph before the window
+        "[13] | Purchase Price",
+        "15 | Closing",
+        "[17] | [Agents]",     # title echoed in brackets
+        "no boundary here",
+        "[26] | Possession",     # context paragraph after the window
+    ])
+    assert chunker.parse_boundaries(output, 13, 26) == {
+        13: "Purchase Price",
+        15: "Closing",
+        17: "Agents",
+    }
+
+
+def test_sections_follow_boundaries_across_windows(chunker, tmp_path):
+    paragraphs = _paragraphs(30)
+    backend = FakeBackend({0: "Buyer Information", 12: "Deposit", 14: "Closing"})
+    sections = chunker.semantic_chunk_contract("\n\n".join(paragraphs), backend,
+                                               cache_path=str(tmp_path / "cache.json"))
+
+    assert [s.splitlines()[0] for s in sections] == [
+        "SECTION: Buyer Information", "SECTION: Deposit", "SECTION: Closing"]
+    assert sections[1].count("Paragraph ") == 2  # 12 and 13, split across two windows
+    assert backend.closed == 1
+
+
+def test_second_run_reuses_cache_and_skips_windows(chunker, tmp_path):
+    paragraphs = _paragraphs(30)
+    cache_path = str(tmp_path / "cache.json")
+    first = FakeBackend({0: "Buyer Information", 20: "Closing"})
+    expected = chunker.semantic_chunk_contract("\n\n".join(paragraphs), first, cache_path)
+    assert len(first.windows) == 3
+
+    second = FakeBackend()
+    assert chunker.semantic_chunk_contract("\n\n".join(paragraphs), second, cache_path) == expected
+    assert second.windows == []
+
+    # Only the window holding an edited paragraph goes back to the model
+    paragraphs[27] = "Possession on closing " + "y" * 280
+    third = FakeBackend()
+    chunker.semantic_chunk_contract("\n\n".join(paragraphs), third, cache_path)
+    assert third.windows == [(26, 30)]
+
+
+def test_failed_windows_are_not_cached(chunker, tmp_path):
+    paragraphs = _paragraphs(30)
+    cache_path = str(tmp_path / "cache.json")
+    failing = FakeBackend({0: "Buyer Information", 20: "Closing"}, fail_windows={13})
+    chunker.semantic_chunk_contract("\n\n".join(paragraphs), failing, cache_path)
+
+    with open(cache_path, encoding="utf-8") as f:
+        cache = json.load(f)
+    hashes = [chunker._paragraph_hash(p) for p in paragraphs]
+    assert all(h not in cache for h in hashes[13:26])
+    assert all(h in cache for h in hashes[:13] + hashes[26:])
+
+    retry = FakeBackend({20: "Closing"})
+    sections = chunker.semantic_chunk_contract("\n\n".join(paragraphs), retry, cache_path)
+    assert retry.windows == [(13, 26)]
+    assert [s.splitlines()[0] for s in sections] == ["SECTION: Buyer Information", "SECTION: Closing"]